@@ -1,13 +1,174 @@
-import requests
+import os
+import orjson
+import requests_cache
+from requests.adapters import HTTPAdapter
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 from datetime import datetime, timedelta
+from numba import njit
+from concurrent.futures import ThreadPoolExecutor
+from collections import Counter
 
 class CryptoAnalysisError(Exception):
     """Custom exception for cryptocurrency analysis errors"""
     pass
 
+# Persistent HTTP cache for CoinGecko responses. Expired entries that carry an
+# ETag/Last-Modified are revalidated with a conditional request, so unchanged
+# data comes back as a 304 instead of a full download.
+_SESSION = requests_cache.CachedSession(
+    cache_name=os.path.expanduser('~/.cryptoapp_cache'),
+    backend='sqlite',
+    expire_after=timedelta(hours=1),
+    urls_expire_after={
+        # Coin IDs rarely change, so search results are kept much longer
+        'api.coingecko.com/api/v3/search': timedelta(days=7),
+    }
+)
+# Keep connections to CoinGecko alive across calls so the TLS handshake is paid once
+_SESSION.headers['Accept-Encoding'] = 'gzip'
+_SESSION.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=4))
+
+# Seconds to wait on the API before giving up on a request
+REQUEST_TIMEOUT = 10
+
+# Worker pool for issuing independent API requests concurrently
+_EXECUTOR = ThreadPoolExecutor(max_workers=2)
+
+def _get_json(url):
+    """
+    Fetch a URL through the shared session and decode the JSON body with orjson
+    """
+    response = _SESSION.get(url, timeout=REQUEST_TIMEOUT)
+    return orjson.loads(response.content)
+
+# Local index of CoinGecko coin IDs, rebuilt from /coins/list once it goes stale
+COIN_INDEX_PATH = os.path.expanduser('~/.cryptoapp_coins.json')
+COIN_INDEX_MAX_AGE = timedelta(days=7)
+_coin_index = None
+
+def _load_coin_index():
+    """
+    Map lowercase coin IDs, names and unambiguous symbols to CoinGecko coin IDs
+    
+    Loaded from disk when fresh, otherwise rebuilt from a single /coins/list request.
+    
+    :return: Dict of lookup key to coin ID (empty if the list could not be fetched)
+    """
+    global _coin_index
+    if _coin_index is not None:
+        return _coin_index
+    
+    try:
+        modified = datetime.fromtimestamp(os.path.getmtime(COIN_INDEX_PATH))
+        if datetime.now() - modified < COIN_INDEX_MAX_AGE:
+            with open(COIN_INDEX_PATH, 'rb') as f:
+                _coin_index = orjson.loads(f.read())
+            return _coin_index
+    except (OSError, ValueError):
+        pass
+    
+    try:
+        coins = _get_json("https://api.coingecko.com/api/v3/coins/list")
+        if not isinstance(coins, list):
+            raise CryptoAnalysisError(f"Unexpected coin list response: {coins}")
+    except Exception as e:
+        # Without the index, unknown names still resolve through the search endpoint
+        print(f"DEBUG: Unable to build coin index: {e}")
+        _coin_index = {}
+        return _coin_index
+    
+    # IDs take priority over names, and names over symbols; names and symbols
+    # shared by several coins are left out since there is no way to pick the
+    # right one, so those inputs still go through the search endpoint
+    index = {entry['id']: entry['id'] for entry in coins}
+    name_counts = Counter(entry['name'].lower() for entry in coins)
+    for entry in coins:
+        name = entry['name'].lower()
+        if name_counts[name] == 1:
+            index.setdefault(name, entry['id'])
+    symbol_counts = Counter(entry['symbol'].lower() for entry in coins)
+    for entry in coins:
+        symbol = entry['symbol'].lower()
+        if symbol_counts[symbol] == 1:
+            index.setdefault(symbol, entry['id'])
+    
+    try:
+        tmp_path = f"{COIN_INDEX_PATH}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(orjson.dumps(index))
+        os.replace(tmp_path, COIN_INDEX_PATH)
+    except OSError as e:
+        print(f"DEBUG: Unable to save coin index: {e}")
+    
+    _coin_index = index
+    return _coin_index
+
+# Integer codes for wave type and magnitude used in the wave records
+WAVE_CORRECTIVE = 0
+WAVE_IMPULSE = 1
+WAVE_MINOR = 0
+WAVE_SIGNIFICANT = 1
+WAVE_MAJOR = 2
+
+# Moves above the minor threshold count as waves; the magnitude bins split them
+# into minor (<= 5%), significant (<= 10%) and major (> 10%)
+WAVE_MINOR_THRESHOLD = 0.02
+WAVE_MAGNITUDE_BINS = np.array([0.05, 0.10])
+
+# Wave labels indexed by position within a run (capped at the "Ext" entry)
+WAVE_IMPULSE_LABELS = np.array(
+    ['Impulse 1', 'Impulse 2', 'Impulse 3', 'Impulse 4', 'Impulse 5', 'Impulse Ext'], dtype=object
+)
+WAVE_CORRECTION_LABELS = np.array(
+    ['Correction A', 'Correction B', 'Correction C', 'Correction Ext'], dtype=object
+)
+
+@njit(cache=True)
+def _rolling_min_max_nb(close, w):
+    """
+    Trailing rolling max and min in one O(N) pass using monotonic index deques
+
+    Matches ``rolling(window=w, min_periods=1)``: the first bars use the partial window.
+
+    :param close: float64 array of prices
+    :param w: Window length in bars
+    :return: (hi, lo) arrays of the same length as ``close``
+    """
+    n = len(close)
+    hi = np.empty(n, np.float64)
+    lo = np.empty(n, np.float64)
+    
+    # Deques of indices, stored as flat arrays with head/tail pointers
+    max_dq = np.empty(n, np.int64)
+    min_dq = np.empty(n, np.int64)
+    max_head = max_tail = 0
+    min_head = min_tail = 0
+    
+    for i in range(n):
+        value = close[i]
+        
+        while max_tail > max_head and close[max_dq[max_tail - 1]] <= value:
+            max_tail -= 1
+        max_dq[max_tail] = i
+        max_tail += 1
+        
+        while min_tail > min_head and close[min_dq[min_tail - 1]] >= value:
+            min_tail -= 1
+        min_dq[min_tail] = i
+        min_tail += 1
+        
+        # Drop indices that have slid out of the window
+        while max_dq[max_head] <= i - w:
+            max_head += 1
+        while min_dq[min_head] <= i - w:
+            min_head += 1
+        
+        hi[i] = close[max_dq[max_head]]
+        lo[i] = close[min_dq[min_head]]
+    
+    return hi, lo
+
 def get_crypto_candles(coin='bitcoin', base_currency='usd', days=365):
     """
     Fetch historical price data for a cryptocurrency using CoinGecko API
@@ -24,71 +185,77 @@ def get_crypto_candles(coin='bitcoin', base_currency='usd', days=365):
         'velero': 'velodrome-finance'
     }
     
-    # Check if coin has a known mapping
+    # Check if coin has a known mapping, then resolve names and symbols locally
     original_coin = coin
     coin = coin_mapping.get(coin, coin)
+    coin_index = _load_coin_index()
+    resolved_locally = coin in coin_index
+    coin = coin_index.get(coin, coin)
     
     # CoinGecko API endpoint for historical market data
     url = f"https://api.coingecko.com/api/v3/coins/{coin}/market_chart?vs_currency={base_currency}&days={days}"
     
     print(f"DEBUG: Attempting to fetch data from URL: {url}")
     
+    # Search endpoint used to resolve the coin ID if the direct lookup fails
+    search_url = f"https://api.coingecko.com/api/v3/search?query={original_coin}"
+    
     try:
-        response = requests.get(url)
-        data = response.json()
+        # Unless the coin index already identified the coin, fire the search
+        # speculatively alongside the market chart request so the fallback path
+        # costs one round-trip instead of two sequential ones
+        primary_future = _EXECUTOR.submit(_get_json, url)
+        search_future = None if resolved_locally else _EXECUTOR.submit(_get_json, search_url)
+        data = primary_future.result()
         
         print(f"DEBUG: Received data keys: {data.keys()}")
         print(f"DEBUG: Prices length: {len(data.get('prices', []))}")
         
-        # If no data, try searching for the coin
+        # If no data, use the search results to find the coin
         if 'prices' not in data or len(data['prices']) == 0:
             # Try to find the correct coin ID
-            search_url = f"https://api.coingecko.com/api/v3/search?query={original_coin}"
-            search_response = requests.get(search_url)
-            search_data = search_response.json()
+            search_data = search_future.result() if search_future else _get_json(search_url)
             
             if search_data.get('coins') and len(search_data['coins']) > 0:
                 # Use the first matching coin
                 coin = search_data['coins'][0]['id']
                 # Retry with the new coin ID
-                response = requests.get(f"https://api.coingecko.com/api/v3/coins/{coin}/market_chart?vs_currency={base_currency}&days={days}")
-                data = response.json()
+                data = _get_json(f"https://api.coingecko.com/api/v3/coins/{coin}/market_chart?vs_currency={base_currency}&days={days}")
             
             if 'prices' not in data or len(data['prices']) == 0:
                 raise CryptoAnalysisError(f"Unable to fetch data for {original_coin}. Check the cryptocurrency name.")
         
-        # Convert price data to DataFrame
-        df = pd.DataFrame(data['prices'], columns=['timestamp', 'close'])
+        # Convert [timestamp, price] pairs to an N x 2 array and split into columns
+        prices = np.asarray(data['prices'], dtype=np.float64)
+        # Drop missing prices up front so every derived column is NaN-free
+        prices = prices[~np.isnan(prices[:, 1])]
+        timestamps = prices[:, 0]
+        close = np.ascontiguousarray(prices[:, 1])
         
         # Print raw data for debugging
-        print(f"DEBUG: DataFrame initial shape: {df.shape}")
-        print(f"DEBUG: First few rows:\n{df.head()}")
-        
-        # Validate DataFrame
-        if len(df) < 2:
-            raise CryptoAnalysisError(f"Insufficient data points for {original_coin}. Need at least 2 data points.")
-        
-        # Convert timestamp to datetime
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        print(f"DEBUG: Price array initial shape: {prices.shape}")
+        print(f"DEBUG: First few rows:\n{prices[:5]}")
         
-        # Calculate additional columns for wave analysis
-        df['open'] = df['close'].shift(1)
+        # Validate price data
+        # The first two bars never start a wave, so fewer than 3 leaves nothing to analyse
+        if len(close) < 3:
+            raise CryptoAnalysisError(f"Insufficient data points for {original_coin}. Need at least 3 data points.")
         
-        # Calculate high and low using rolling window instead of groupby
-        df['high'] = df['close'].rolling(window=4, min_periods=1).max()
-        df['low'] = df['close'].rolling(window=4, min_periods=1).min()
+        # Calculate high and low over a trailing 4-bar window in a single pass
+        high, low = _rolling_min_max_nb(close, 4)
         
-        # Drop first row (which will have NaN open due to shift)
-        df = df.dropna()
+        # Build the DataFrame column by column
+        df = pd.DataFrame({
+            'timestamp': timestamps.astype(np.int64),
+            'close': close,
+            'high': high,
+            'low': low
+        })
         
         # Print processed DataFrame for debugging
         print(f"DEBUG: DataFrame after processing shape: {df.shape}")
         print(f"DEBUG: DataFrame columns after processing: {df.columns}")
         
-        # Ensure at least 2 rows remain after processing
-        if len(df) < 2:
-            raise CryptoAnalysisError(f"Insufficient processed data points for {original_coin}.")
-        
         return df
     except Exception as e:
         # Print full exception details for debugging
@@ -100,122 +267,152 @@ def detect_elliot_waves(df, coin):
     """
     Advanced Elliot Wave detection with comprehensive analysis
     """
-    # Calculate additional technical indicators
-    df['price_change'] = df['close'].diff()
-    df['pct_change'] = df['close'].pct_change()
+    # Pull the close prices out once and derive the indicators with plain numpy,
+    # writing straight into preallocated buffers (the first bar has no change)
+    close = df['close'].to_numpy(dtype=np.float64)
+    delta = np.empty_like(close)
+    delta[:1] = np.nan
+    np.subtract(close[1:], close[:-1], out=delta[1:])
+    pct_change = np.empty_like(close)
+    pct_change[:1] = np.nan
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.divide(delta[1:], close[:-1], out=pct_change[1:])
     
-    # Calculate RSI (Relative Strength Index)
-    delta = df['close'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-    rs = gain / loss
-    df['rsi'] = 100 - (100 / (1 + rs))
+    # Calculate RSI (Relative Strength Index) using Wilder's smoothing. The first
+    # delta is undefined, so the averages are seeded with the mean of the first
+    # 14 real deltas and the RSI is left NaN until then
+    rsi_period = 14
+    gain = np.where(delta[1:] > 0, delta[1:], 0.0)
+    loss = np.where(delta[1:] < 0, -delta[1:], 0.0)
+    rsi = np.full(len(close), np.nan)
+    if len(gain) >= rsi_period:
+        # Replace the 14th delta with the seed so ewm(adjust=False) continues from it
+        seed_gain, seed_loss = gain[:rsi_period].mean(), loss[:rsi_period].mean()
+        gain, loss = gain[rsi_period - 1:].copy(), loss[rsi_period - 1:].copy()
+        gain[0], loss[0] = seed_gain, seed_loss
+        avg_gain = pd.Series(gain).ewm(alpha=1/rsi_period, adjust=False).mean().to_numpy()
+        avg_loss = pd.Series(loss).ewm(alpha=1/rsi_period, adjust=False).mean().to_numpy()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rs = avg_gain / avg_loss
+        rsi[rsi_period:] = 100 - (100 / (1 + rs))
+    df['rsi'] = rsi
     
     def identify_wave_pattern(series):
         """
         Sophisticated wave pattern identification with Elliot Wave principles
         """
-        waves = {
-            'impulse_waves': [],
-            'corrective_waves': [],
-            'wave_details': [],
-            'wave_labels': []
-        }
+        # Classify every bar at once; NaN fails the comparison, so missing values are skipped
+        abs_change = np.abs(series)
+        keep = abs_change > WAVE_MINOR_THRESHOLD
+        # The first two bars never start a wave: the first has no change, and the
+        # change into the second was skipped when the frame still dropped row 0
+        keep[:2] = False
+        idx = np.flatnonzero(keep).astype(np.int32)
         
-        # Detect significant price movements
-        thresholds = {
-            'minor': 0.02,   # 2% minor movement
-            'significant': 0.05,  # 5% significant movement
-            'major': 0.10    # 10% major movement
-        }
+        types = (series[idx] > 0).astype(np.int8)
+        # side='left' keeps the thresholds strict: exactly 5% is still minor
+        mags = np.searchsorted(WAVE_MAGNITUDE_BINS, abs_change[idx], side='left').astype(np.int8)
         
-        # Track wave progression
-        current_wave_type = None
-        wave_count = 0
+        # Number each wave within its run of same-type waves: a run starts wherever
+        # the type flips, and the count is the distance from that run's start
+        run_start = np.ones(len(types), dtype=bool)
+        run_start[1:] = types[1:] != types[:-1]
+        run_id = np.cumsum(run_start) - 1
+        counts = np.arange(len(types)) - np.flatnonzero(run_start)[run_id] + 1
         
-        for i in range(1, len(series)):
-            change = series[i]
-            
-            if abs(change) > thresholds['minor']:
-                wave_type = 'impulse' if change > 0 else 'corrective'
-                wave_magnitude = 'minor'
-                
-                if abs(change) > thresholds['significant']:
-                    wave_magnitude = 'significant'
-                
-                if abs(change) > thresholds['major']:
-                    wave_magnitude = 'major'
-                
-                # Determine wave label based on progression
-                if wave_type == 'impulse':
-                    if current_wave_type != 'impulse':
-                        wave_count = 1
-                        current_wave_type = 'impulse'
-                    else:
-                        wave_count += 1
-                    
-                    wave_label = f'Impulse {wave_count}' if wave_count <= 5 else 'Impulse Ext'
-                else:
-                    if current_wave_type != 'corrective':
-                        wave_count = 1
-                        current_wave_type = 'corrective'
-                    else:
-                        wave_count += 1
-                    
-                    wave_label = f'Correction {chr(64 + wave_count)}' if wave_count <= 3 else 'Correction Ext'
-                
-                wave_details = {
-                    'type': wave_type,
-                    'magnitude': wave_magnitude,
-                    'start_index': i-1,
-                    'end_index': i,
-                    'percentage_change': change * 100,
-                    'label': wave_label
-                }
-                
-                waves['wave_details'].append(wave_details)
-                waves['wave_labels'].append(wave_label)
-                
-                if wave_type == 'impulse':
-                    waves['impulse_waves'].append(wave_details)
-                else:
-                    waves['corrective_waves'].append(wave_details)
+        labels = np.where(
+            types == WAVE_IMPULSE,
+            WAVE_IMPULSE_LABELS[np.minimum(counts, len(WAVE_IMPULSE_LABELS)) - 1],
+            WAVE_CORRECTION_LABELS[np.minimum(counts, len(WAVE_CORRECTION_LABELS)) - 1]
+        )
+        
+        # Waves are stored column-wise: one array per attribute, indexed by wave number
+        waves = {
+            'type': types,
+            'magnitude': mags,
+            'start': idx - 1,
+            'end': idx.copy(),
+            'pct': series[idx] * 100,
+            'label': labels
+        }
         
         return waves
     
     # Analyze waves
-    waves = identify_wave_pattern(df['pct_change'].values)
+    waves = identify_wave_pattern(pct_change)
+    
+    # Clamp wave bounds to valid row positions once, so consumers can index directly
+    last_index = len(df) - 1
+    np.clip(waves['start'], 0, last_index, out=waves['start'])
+    np.clip(waves['end'], 0, last_index, out=waves['end'])
+    
+    return waves, df
+
+def render_waves(df, waves, coin):
+    """
+    Plot price with highlighted Elliot Waves and RSI, saving the chart as a PNG
+    
+    :param df: DataFrame returned by detect_elliot_waves
+    :param waves: Wave records returned by detect_elliot_waves
+    :param coin: Cryptocurrency name used for the title and file name
+    :return: Filename of the saved plot
+    """
+    # matplotlib is only needed for charts, so its startup cost is paid on first use
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import matplotlib.colors as mcolors
+    import matplotlib.dates as mdates
+    from matplotlib.collections import PolyCollection
+    
+    # Let Agg drop line vertices that don't change the rendered path
+    plt.rcParams['path.simplify_threshold'] = 1.0
+    
+    # Timestamps are kept as unix milliseconds; convert them only for plotting
+    timestamps = df['timestamp'].to_numpy().astype('datetime64[ms]')
     
     # Visualize waves
     plt.figure(figsize=(20, 10))
     
     # Price plot
-    plt.subplot(2, 1, 1)
-    plt.plot(df['timestamp'], df['close'], label='Price', color='blue')
+    ax_price = plt.subplot(2, 1, 1)
+    plt.plot(timestamps, df['close'], label='Price', color='blue')
     plt.title(f'{coin.capitalize()} Price with Elliot Wave Analysis')
     plt.xlabel('Timestamp')
     plt.ylabel('Price')
     
-    # Highlight waves with safety checks and labels
-    for wave in waves['wave_details']:
-        start_index = max(0, min(wave['start_index'], len(df) - 1))
-        end_index = max(0, min(wave['end_index'], len(df) - 1))
-        
-        color = 'green' if wave['type'] == 'impulse' else 'red'
-        alpha = 0.1 if wave['magnitude'] == 'minor' else 0.3 if wave['magnitude'] == 'significant' else 0.5
-        
-        plt.axvspan(
-            df['timestamp'].iloc[start_index], 
-            df['timestamp'].iloc[end_index], 
-            color=color, alpha=alpha
-        )
-        
-        # Add wave labels
-        mid_index = (start_index + end_index) // 2
-        plt.text(
-            df['timestamp'].iloc[mid_index], 
-            df['close'].iloc[mid_index], 
-            wave['label'], 
+    # Highlight waves with labels
+    colors = np.where(waves['type'] == WAVE_IMPULSE, 'green', 'red')
+    alphas = np.where(
+        waves['magnitude'] == WAVE_MINOR, 0.1,
+        np.where(waves['magnitude'] == WAVE_SIGNIFICANT, 0.3, 0.5)
+    )
+    
+    # Draw all wave spans as one collection: x in data (date) units, y spanning
+    # the full axes height, the same geometry axvspan would produce per wave
+    x0 = mdates.date2num(timestamps[waves['start']])
+    x1 = mdates.date2num(timestamps[waves['end']])
+    verts = np.stack([
+        np.column_stack([x0, x0, x1, x1]),
+        np.broadcast_to([0.0, 1.0, 1.0, 0.0], (len(x0), 4))
+    ], axis=-1)
+    span_colors = mcolors.to_rgba_array(colors, alpha=alphas)
+    ax_price.add_collection(
+        PolyCollection(
+            verts, facecolors=span_colors, edgecolors=span_colors,
+            transform=ax_price.get_xaxis_transform()
+        ),
+        autolim=False
+    )
+    
+    # Add wave labels at the midpoint of each span
+    close_values = df['close'].to_numpy()
+    mid_indices = (waves['start'] + waves['end']) // 2
+    for mid_time, mid_close, label in zip(timestamps[mid_indices], close_values[mid_indices], waves['label']):
+        ax_price.text(
+            mid_time, 
+            mid_close, 
+            label, 
             fontsize=8, 
             color='black', 
             verticalalignment='bottom'
@@ -223,7 +420,7 @@ def detect_elliot_waves(df, coin):
     
     # RSI subplot
     plt.subplot(2, 1, 2)
-    plt.plot(df['timestamp'], df['rsi'], label='RSI', color='purple')
+    plt.plot(timestamps, df['rsi'], label='RSI', color='purple')
     plt.title('Relative Strength Index (RSI)')
     plt.xlabel('Timestamp')
     plt.ylabel('RSI')
@@ -237,36 +434,36 @@ def detect_elliot_waves(df, coin):
     plt.savefig(plot_filename)
     plt.close()
     
-    return waves, df, plot_filename
+    return plot_filename
 
 def interpret_elliot_waves(waves, df, coin):
     """
     Interpret Elliot Wave patterns and provide investment insights
     """
     # Analyze wave characteristics
-    impulse_waves = waves['impulse_waves']
-    corrective_waves = waves['corrective_waves']
+    impulse_count = np.count_nonzero(waves['type'] == WAVE_IMPULSE)
+    corrective_count = np.count_nonzero(waves['type'] == WAVE_CORRECTIVE)
     
     # Current price and trend analysis
     current_price = df['close'].iloc[-1]
-    price_trend = 'bullish' if impulse_waves and impulse_waves[-1]['type'] == 'impulse' else 'bearish'
+    price_trend = 'bullish' if impulse_count > 0 else 'bearish'
     
     # Wave pattern interpretation
     wave_interpretation = {
-        'total_waves': len(waves['wave_details']),
-        'impulse_waves_count': len(impulse_waves),
-        'corrective_waves_count': len(corrective_waves),
+        'total_waves': len(waves['type']),
+        'impulse_waves_count': impulse_count,
+        'corrective_waves_count': corrective_count,
         'dominant_trend': price_trend
     }
     
     # Investment recommendation logic
     def get_investment_recommendation():
         # Basic recommendation based on wave patterns
-        if len(impulse_waves) > len(corrective_waves) and price_trend == 'bullish':
+        if impulse_count > corrective_count and price_trend == 'bullish':
             return "STRONG BUY", "The current wave pattern suggests a strong upward momentum."
-        elif len(impulse_waves) > len(corrective_waves):
+        elif impulse_count > corrective_count:
             return "MODERATE BUY", "The wave pattern indicates potential growth."
-        elif len(corrective_waves) > len(impulse_waves):
+        elif corrective_count > impulse_count:
             return "HOLD/CAUTION", "The market shows more corrective patterns, suggesting potential volatility."
         else:
             return "NEUTRAL", "The wave patterns are relatively balanced."
@@ -307,6 +504,9 @@ def main():
     print("Popular Cryptocurrencies:")
     print(", ".join(coin.capitalize() for coin in set(popular_coins)))
     
+    # Load the coin index up front so lookups in the loop stay local
+    _load_coin_index()
+    
     while True:
         try:
             # User input for cryptocurrency
@@ -319,7 +519,7 @@ def main():
             df = get_crypto_candles(coin)
             
             # Detect waves
-            waves, price_df, plot_filename = detect_elliot_waves(df, coin)
+            waves, price_df = detect_elliot_waves(df, coin)
             
             # Interpret waves and get recommendation
             analysis = interpret_elliot_waves(waves, price_df, coin)
@@ -330,6 +530,8 @@ def main():
             # Option to view wave visualization
             view_graph = input("\nView wave visualization? (yes/no): ").lower().strip()
             if view_graph == 'yes':
+                # Only render the chart when it is actually wanted
+                plot_filename = render_waves(price_df, waves, coin)
                 print(f"\nWave visualization saved as {plot_filename}")
                 print("To view the plot, use the command:")
                 print(f"open {plot_filename}")